@@ -1,24 +1,99 @@
 """Utilities for handling image and video paste from clipboard."""
 
-import base64
+import functools
 import io
 import logging
-import os
 import pathlib
 import shutil
 
 # S404: subprocess needed for clipboard access via pngpaste/osascript
 import subprocess  # noqa: S404
 import sys
-import tempfile
-from dataclasses import dataclass
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import BinaryIO
 
-logger = logging.getLogger(__name__)
+try:
+    # Optional `fast-base64` extra: SIMD-accelerated drop-in for
+    # base64.b64encode with byte-for-byte identical output
+    from pybase64 import b64encode as _b64encode  # ty: ignore[unresolved-import]
+except ImportError:
+    from base64 import b64encode as _b64encode
 
+logger = logging.getLogger(__name__)
 
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+"""Eight-byte magic number every PNG file starts with."""
+
+_VIDEO_FORMAT_MAP: dict[str, str] = {
+    ".mp4": "mp4",
+    ".m4v": "mp4",
+    ".mov": "quicktime",
+    ".avi": "avi",
+    ".mkv": "x-matroska",
+    ".webm": "webm",
+    ".mpeg": "mpeg",
+    ".mpg": "mpeg",
+    ".wmv": "x-ms-wmv",
+    ".flv": "x-flv",
+}
+"""Supported video file extensions mapped to their `video/*` MIME subtype."""
+
+_OSASCRIPT_CLIPBOARD_IMAGE_SCRIPT = """
+try
+    set imageData to the clipboard as «class PNGf»
+on error
+    try
+        set imageData to the clipboard as TIFF picture
+    on error
+        return
+    end try
+end try
+set theFile to open for access POSIX file "/dev/stdout" with write permission
+write imageData to theFile
+close access theFile
+"""
+"""AppleScript that writes the clipboard image (PNG, else TIFF) to stdout.
+
+Produces no output when the clipboard holds neither format.
+"""
+
+_VIDEO_HEADER_SIZE = 32
+"""Number of leading bytes read to validate a video file's signature."""
+
+_IMAGE_HEADER_SIZE = 18
+"""Number of leading bytes read to sniff an image file's format.
+
+Covers the BMP DIB header size field at offset 14, the deepest field checked.
+"""
+
+_BMP_DIB_HEADER_SIZES = frozenset({12, 40, 52, 56, 64, 108, 124})
+"""Valid BMP DIB header sizes (BITMAPCOREHEADER through BITMAPV5HEADER).
+
+`BM` alone is too weak a signature (plain text can start with it), so the DIB
+header size stored at offset 14 must also match a known header version.
+"""
+
+_BASE64_CHUNK_SIZE = 48 * 1024
+"""Read size used when streaming files into base64.
+
+Must be a multiple of 3 so each chunk encodes without padding and the
+per-chunk outputs concatenate into one valid base64 string.
+"""
+
+
+@functools.cache
 def _get_executable(name: str) -> str | None:
     """Get full path to an executable using shutil.which().
 
+    Results are cached for the lifetime of the process so repeated pastes do
+    not rescan `$PATH`.
+
+    The returned path is absolute, which together with `close_fds=False` lets
+    `subprocess.run` launch clipboard helpers via `posix_spawn()` instead of
+    fork/exec. Leaving fds open is safe because Python creates file descriptors
+    non-inheritable by default (PEP 446).
+
     Args:
         name: Name of the executable to find
 
@@ -28,13 +103,16 @@ def _get_executable(name: str) -> str | None:
     return shutil.which(name)
 
 
-@dataclass
+@dataclass(slots=True)
 class ImageData:
     """Represents a pasted image with its base64 encoding."""
 
     base64_data: str
     format: str  # "png", "jpeg", etc.
     placeholder: str  # Display text like "[image 1]"
+    id: int = 0  # Numeric placeholder ID assigned by MediaTracker, 0 if untracked
+    _data_url: str | None = field(default=None, init=False, repr=False, compare=False)
+    """Lazily built `data:` URL, reused across turns to avoid re-concatenating."""
 
     def to_message_content(self) -> dict:
         """Convert to LangChain message content format.
@@ -42,19 +120,24 @@ class ImageData:
         Returns:
             Dict with type and image_url for multimodal messages.
         """
+        if self._data_url is None:
+            self._data_url = f"data:image/{self.format};base64,{self.base64_data}"
         return {
             "type": "image_url",
-            "image_url": {"url": f"data:image/{self.format};base64,{self.base64_data}"},
+            "image_url": {"url": self._data_url},
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class VideoData:
     """Represents a pasted video with its base64 encoding."""
 
     base64_data: str
     format: str  # "mp4", "mov", etc.
     placeholder: str  # Display text like "[video 1]"
+    id: int = 0  # Numeric placeholder ID assigned by MediaTracker, 0 if untracked
+    _data_url: str | None = field(default=None, init=False, repr=False, compare=False)
+    """Lazily built `data:` URL, reused across turns to avoid re-concatenating."""
 
     def to_message_content(self) -> dict:
         """Convert to OpenAI-compatible video URL format.
@@ -62,9 +145,11 @@ class VideoData:
         Returns:
             Dict with type and video_url for multimodal messages.
         """
+        if self._data_url is None:
+            self._data_url = f"data:video/{self.format};base64,{self.base64_data}"
         return {
             "type": "video_url",
-            "video_url": {"url": f"data:video/{self.format};base64,{self.base64_data}"},
+            "video_url": {"url": self._data_url},
         }
 
 
@@ -87,42 +172,68 @@ def get_clipboard_image() -> ImageData | None:
     return None
 
 
-def get_image_from_path(path: pathlib.Path) -> ImageData | None:
-    """Read and encode an image file from disk.
+def _detect_image_format(head: bytes) -> str | None:
+    """Identify an image format from the file's leading magic bytes.
 
     Args:
-        path: Path to the image file.
+        head: The first bytes of the file (at least 18 for BMP detection).
 
     Returns:
-        `ImageData` when the file is a valid image, otherwise `None`.
+        Lowercase format name suitable for a `data:image/...` URL, or `None` if
+        the bytes don't match a supported image signature.
     """
-    from PIL import Image, UnidentifiedImageError
+    if head.startswith(_PNG_SIGNATURE):
+        return "png"
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return "gif"
+    if head.startswith(b"RIFF") and head[8:12] == b"WEBP":
+        return "webp"
+    if (
+        head.startswith(b"BM")
+        and len(head) >= 18  # noqa: PLR2004  # BM file header + DIB size field
+        and int.from_bytes(head[14:18], "little") in _BMP_DIB_HEADER_SIZES
+    ):
+        return "bmp"
+    return None
 
-    try:
-        image_bytes = path.read_bytes()
-        if not image_bytes:
-            return None
 
-        with Image.open(io.BytesIO(image_bytes)) as image:
-            image_format = (image.format or "").lower()
+def get_image_from_path(path: pathlib.Path) -> ImageData | None:
+    """Read and encode an image file from disk.
 
-        if image_format == "jpg":
-            image_format = "jpeg"
-        if not image_format:
-            suffix = path.suffix.lower().removeprefix(".")
-            image_format = "jpeg" if suffix == "jpg" else suffix
-        if not image_format:
-            image_format = "png"
+    Common formats are sniffed from the file's magic bytes and passed through
+    without decoding; anything else is converted to PNG with Pillow if it can
+    be opened.
 
-        return ImageData(
-            base64_data=encode_image_to_base64(image_bytes),
-            format=image_format,
-            placeholder="[image]",
-        )
-    except (UnidentifiedImageError, OSError) as e:
+    Args:
+        path: Path to the image file.
+
+    Returns:
+        `ImageData` when the file is a supported image, otherwise `None`.
+    """
+    try:
+        with path.open("rb") as f:
+            image_format = _detect_image_format(f.read(_IMAGE_HEADER_SIZE))
+            f.seek(0)
+            if image_format is None:
+                # Not one of the sniffed formats; let Pillow try (e.g. TIFF) and
+                # convert to PNG so the model gets a widely supported format
+                logger.debug("No known image signature in %s, trying Pillow", path)
+                base64_data = _encode_as_png_base64(f)
+                image_format = "png"
+            else:
+                base64_data = _encode_stream_to_base64(f)
+    except OSError as e:
         logger.debug("Failed to load image from %s: %s", path, e, exc_info=True)
         return None
 
+    return ImageData(
+        base64_data=base64_data,
+        format=image_format,
+        placeholder="[image]",
+    )
+
 
 def get_video_from_path(path: pathlib.Path) -> VideoData | None:
     """Read and encode a video file from disk.
@@ -133,79 +244,51 @@ def get_video_from_path(path: pathlib.Path) -> VideoData | None:
     Returns:
         `VideoData` when the file is a valid video, otherwise `None`.
     """
-    # Common video file extensions
-    video_extensions = {
-        ".mp4",
-        ".mov",
-        ".avi",
-        ".mkv",
-        ".webm",
-        ".m4v",
-        ".mpeg",
-        ".mpg",
-        ".wmv",
-        ".flv",
-    }
-
     suffix = path.suffix.lower()
-    if suffix not in video_extensions:
+    if suffix not in _VIDEO_FORMAT_MAP:
         return None
 
     try:
-        video_bytes = path.read_bytes()
-        if not video_bytes:
-            return None
-
-        # Validate it's a real video file by checking magic bytes
-        # MP4 starts with ftyp, MOV also uses ftyp, AVI starts with RIFF
-        min_video_len = 4
-        if len(video_bytes) < min_video_len:
-            return None
-
-        # Basic validation - check for common video file signatures
-        is_valid = False
-        min_avi_len = 8
-        if video_bytes[4:8] == b"ftyp":  # MP4/MOV
-            is_valid = True
-        elif (
-            video_bytes[:4] == b"RIFF"
-            and len(video_bytes) > min_avi_len
-            and video_bytes[8:12] == b"AVI "
-        ):  # AVI
-            is_valid = True
-        elif video_bytes[:4] == b"0&\x02b" or suffix == ".webm":
-            # ASF/WMV and WebM (simplified check)
-            is_valid = True
-
-        if not is_valid:
-            # For other formats, try to validate with a video library if available
-            # Fall back to accepting the file based on extension
-            logger.debug("Video signature validation skipped for %s", path)
-
-        # Determine mime type from extension
-        format_map = {
-            ".mp4": "mp4",
-            ".m4v": "mp4",
-            ".mov": "quicktime",
-            ".avi": "avi",
-            ".mkv": "x-matroska",
-            ".webm": "webm",
-            ".mpeg": "mpeg",
-            ".mpg": "mpeg",
-            ".wmv": "x-ms-wmv",
-            ".flv": "x-flv",
-        }
-        video_format = format_map.get(suffix, "mp4")
+        with path.open("rb") as f:
+            # Only the header is read before validation, so rejected files cost
+            # a few bytes of I/O; valid ones are then streamed into the encoder
+            # from the same handle.
+            header = f.read(_VIDEO_HEADER_SIZE)
+
+            # Validate it's a real video file by checking magic bytes
+            # MP4 starts with ftyp, MOV also uses ftyp, AVI starts with RIFF
+            min_video_len = 4
+            if len(header) < min_video_len:
+                return None
+
+            # Basic validation - check for common video file signatures.
+            # startswith() with an offset compares in place, without allocating
+            # a slice per check, and is simply False when the header is too short.
+            is_valid = (
+                header.startswith(b"ftyp", 4)  # MP4/MOV
+                or (header.startswith(b"RIFF") and header.startswith(b"AVI ", 8))  # AVI
+                # ASF/WMV and WebM (simplified check)
+                or header.startswith(b"0&\x02b")
+                or suffix == ".webm"
+            )
 
-        return VideoData(
-            base64_data=encode_image_to_base64(video_bytes),
-            format=video_format,
-            placeholder="[video]",
-        )
+            if not is_valid:
+                # For other formats, try to validate with a video library if
+                # available. Fall back to accepting the file based on extension
+                logger.debug("Video signature validation skipped for %s", path)
+
+            f.seek(0)
+            base64_data = _encode_stream_to_base64(f)
     except (OSError, ValueError) as e:
         logger.debug("Failed to load video from %s: %s", path, e, exc_info=True)
         return None
 
+    return VideoData(
+        base64_data=base64_data,
+        format=_VIDEO_FORMAT_MAP[suffix],
+        placeholder="[video]",
+    )
+
 
 def _get_macos_clipboard_image() -> ImageData | None:
     """Get clipboard image on macOS using pngpaste or osascript.
@@ -215,8 +298,6 @@ def _get_macos_clipboard_image() -> ImageData | None:
     Returns:
         ImageData if an image is found, None otherwise.
     """
-    from PIL import Image, UnidentifiedImageError
-
     # Try pngpaste first (fast if installed)
     pngpaste_path = _get_executable("pngpaste")
     if pngpaste_path:
@@ -227,149 +308,111 @@ def _get_macos_clipboard_image() -> ImageData | None:
                 capture_output=True,
                 check=False,
                 timeout=2,
+                close_fds=False,  # Enables posix_spawn, see _get_executable
             )
             if result.returncode == 0 and result.stdout:
-                # Successfully got PNG data - validate it's a real image
-                try:
-                    Image.open(io.BytesIO(result.stdout))
-                    base64_data = base64.b64encode(result.stdout).decode("utf-8")
+                # 'pngpaste -' always outputs PNG, so the signature is enough to
+                # validate it without decoding the whole image
+                if result.stdout.startswith(_PNG_SIGNATURE):
                     return ImageData(
-                        base64_data=base64_data,
-                        format="png",  # 'pngpaste -' always outputs PNG
+                        base64_data=encode_image_to_base64(result.stdout),
+                        format="png",
                         placeholder="[image]",
                     )
-                except (
-                    # UnidentifiedImageError: corrupted or non-image data
-                    UnidentifiedImageError,
-                    OSError,  # OSError: I/O errors during image processing
-                ) as e:
-                    logger.debug(
-                        "Invalid image data from pngpaste: %s", e, exc_info=True
-                    )
+                logger.debug("Invalid image data from pngpaste: missing PNG signature")
         except FileNotFoundError:
             # pngpaste not installed - expected on systems without it
             logger.debug("pngpaste not found, falling back to osascript")
         except subprocess.TimeoutExpired:
             logger.debug("pngpaste timed out after 2 seconds")
 
-    # Fallback to osascript with temp file (built-in but slower)
+    # Fallback to osascript (built-in but slower)
     return _get_clipboard_via_osascript()
 
 
 def _get_clipboard_via_osascript() -> ImageData | None:
-    """Get clipboard image via osascript using a temp file.
+    """Get clipboard image via osascript.
 
-    osascript outputs data in a special format that can't be captured as raw binary,
-    so we write to a temp file instead.
+    osascript prints script results in a special text format that can't carry raw
+    binary, so the script writes the image bytes to `/dev/stdout` itself and
+    returns nothing. The bytes are then read straight from the captured pipe.
+
+    A single script both probes the clipboard and fetches the data, preferring
+    PNG and falling back to TIFF, so only one osascript process is spawned.
 
     Returns:
         ImageData if an image is found, None otherwise.
     """
-    from PIL import Image, UnidentifiedImageError
-
     # Get osascript path - it's a macOS builtin so should always exist
     osascript_path = _get_executable("osascript")
     if not osascript_path:
         return None
 
-    # Create a temp file for the image
-    fd, temp_path = tempfile.mkstemp(suffix=".png")
-    os.close(fd)
-
     try:
-        # First check if clipboard has PNG data
-        # S603: osascript_path is validated via shutil.which(), args are hardcoded
-        check_result = subprocess.run(  # noqa: S603
-            [osascript_path, "-e", "clipboard info"],
-            capture_output=True,
-            check=False,
-            timeout=2,
-            text=True,
-        )
-
-        if check_result.returncode != 0:
-            return None
-
-        # Check for PNG or TIFF in clipboard info
-        clipboard_info = check_result.stdout.lower()
-        if "pngf" not in clipboard_info and "tiff" not in clipboard_info:
-            return None
-
-        # Try to get PNG first, fall back to TIFF
-        if "pngf" in clipboard_info:
-            get_script = f"""
-            set pngData to the clipboard as «class PNGf»
-            set theFile to open for access POSIX file "{temp_path}" with write permission
-            write pngData to theFile
-            close access theFile
-            return "success"
-            """  # noqa: E501
-        else:
-            get_script = f"""
-            set tiffData to the clipboard as TIFF picture
-            set theFile to open for access POSIX file "{temp_path}" with write permission
-            write tiffData to theFile
-            close access theFile
-            return "success"
-            """  # noqa: E501
-
         # S603: osascript_path validated via shutil.which(), script is internal
         result = subprocess.run(  # noqa: S603
-            [osascript_path, "-e", get_script],
+            [osascript_path, "-e", _OSASCRIPT_CLIPBOARD_IMAGE_SCRIPT],
             capture_output=True,
             check=False,
             timeout=3,
-            text=True,
+            close_fds=False,  # Enables posix_spawn, see _get_executable
         )
-
-        if result.returncode != 0 or "success" not in result.stdout:
-            return None
-
-        # Check if file was created and has content
-        if (
-            not pathlib.Path(temp_path).exists()
-            or pathlib.Path(temp_path).stat().st_size == 0
-        ):
-            return None
-
-        # Read and validate the image
-        image_data = pathlib.Path(temp_path).read_bytes()
-
-        try:
-            image = Image.open(io.BytesIO(image_data))
-            # Convert to PNG if it's not already (e.g., if we got TIFF)
-            buffer = io.BytesIO()
-            image.save(buffer, format="PNG")
-            buffer.seek(0)
-            base64_data = base64.b64encode(buffer.getvalue()).decode("utf-8")
-
-            return ImageData(
-                base64_data=base64_data,
-                format="png",
-                placeholder="[image]",
-            )
-        except (
-            # UnidentifiedImageError: corrupted or non-image data
-            UnidentifiedImageError,
-            OSError,  # OSError: I/O errors during image processing
-        ) as e:
-            logger.debug(
-                "Failed to process clipboard image via osascript: %s", e, exc_info=True
-            )
-            return None
-
     except subprocess.TimeoutExpired:
         logger.debug("osascript timed out while accessing clipboard")
         return None
     except OSError as e:
         logger.debug("OSError accessing clipboard via osascript: %s", e)
         return None
-    finally:
-        # Clean up temp file
-        try:
-            pathlib.Path(temp_path).unlink()
-        except OSError as e:
-            logger.debug("Failed to clean up temp file %s: %s", temp_path, e)
+
+    # Empty output means the clipboard holds neither PNG nor TIFF data
+    if result.returncode != 0 or not result.stdout:
+        return None
+
+    image_data = result.stdout
+
+    # PNG data can be passed through as-is; only TIFF needs a re-encode
+    if image_data.startswith(_PNG_SIGNATURE):
+        return ImageData(
+            base64_data=encode_image_to_base64(image_data),
+            format="png",
+            placeholder="[image]",
+        )
+
+    try:
+        return ImageData(
+            base64_data=_encode_as_png_base64(io.BytesIO(image_data)),
+            format="png",
+            placeholder="[image]",
+        )
+    # PIL's UnidentifiedImageError (corrupted or non-image data) subclasses OSError
+    except OSError as e:
+        logger.debug(
+            "Failed to process clipboard image via osascript: %s", e, exc_info=True
+        )
+        return None
+
+
+def _encode_as_png_base64(source: BinaryIO) -> str:
+    """Decode an image with Pillow and return it re-encoded as base64 PNG.
+
+    Used for formats that can't be passed through as-is (e.g. TIFF). Pillow's
+    `OSError` (including `UnidentifiedImageError`) propagates to the caller.
+
+    Args:
+        source: Binary stream positioned at the start of the image data.
+
+    Returns:
+        Base64-encoded PNG data.
+    """
+    # Deferred so PIL stays off the startup path; only non-sniffed formats need it
+    from PIL import Image
+
+    with Image.open(source) as image:
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+    # getbuffer() exposes the PNG bytes as a zero-copy view (getvalue() copies)
+    with buffer.getbuffer() as png_bytes:
+        return _b64encode(png_bytes).decode("ascii")
 
 
 def encode_image_to_base64(image_bytes: bytes) -> str:
@@ -381,33 +424,48 @@ def encode_image_to_base64(image_bytes: bytes) -> str:
     Returns:
         Base64-encoded string.
     """
-    return base64.b64encode(image_bytes).decode("utf-8")
+    return _b64encode(image_bytes).decode("ascii")
+
+
+def _encode_stream_to_base64(stream: BinaryIO) -> str:
+    """Encode the rest of a binary stream to base64 in fixed-size chunks.
+
+    Args:
+        stream: Buffered binary stream positioned where encoding should start.
+
+    Returns:
+        Base64-encoded string.
+    """
+    encoded = bytearray()
+    while chunk := stream.read(_BASE64_CHUNK_SIZE):
+        encoded += _b64encode(chunk)
+    return encoded.decode("ascii")
 
 
 def create_multimodal_content(
-    text: str, images: list[ImageData], videos: list[VideoData] | None = None
+    text: str,
+    images: Sequence[ImageData],
+    videos: Sequence[VideoData] | None = None,
 ) -> list[dict]:
     """Create multimodal message content with text, images, and videos.
 
     Args:
         text: Text content of the message
-        images: List of ImageData objects
-        videos: Optional list of VideoData objects
+        images: Sequence of ImageData objects
+        videos: Optional sequence of VideoData objects
 
     Returns:
         List of content blocks in OpenAI-compatible format.
     """
-    content_blocks = []
-
     # Add text block
-    if text.strip():
-        content_blocks.append({"type": "text", "text": text})
-
-    # Add image blocks
-    content_blocks.extend(image.to_message_content() for image in images)
+    content_blocks: list[dict] = (
+        [{"type": "text", "text": text}] if text.strip() else []
+    )
 
-    # Add video blocks
+    # Add image and video blocks. Extending with sized lists (rather than
+    # generators) lets each extend() grow the list in a single resize.
+    content_blocks.extend([image.to_message_content() for image in images])
     if videos:
-        content_blocks.extend(video.to_message_content() for video in videos)
+        content_blocks.extend([video.to_message_content() for video in videos])
 
     return content_blocks
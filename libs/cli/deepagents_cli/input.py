@@ -3,6 +3,8 @@
 import logging
 import re
 import shlex
+import stat
+import string
 from pathlib import Path
 from urllib.parse import unquote, urlparse
 
@@ -28,12 +30,13 @@ Uses `+` (not `*`) because a bare `@` without a path is not a valid
 file reference.
 """
 
-EMAIL_PREFIX_PATTERN = re.compile(r"[a-zA-Z0-9._%+-]$")
-"""Pattern to detect email-like text preceding an `@` symbol.
+EMAIL_PREFIX_CHARS = frozenset(string.ascii_letters + string.digits + "._%+-")
+"""Characters that indicate email-like text when they precede an `@` symbol.
 
-If the character immediately before `@` matches this pattern, the `@mention`
-is likely part of an email address (e.g., `user@example.com`) rather than
-a file reference.
+If the character immediately before `@` is in this set, the `@mention` is
+likely part of an email address (e.g., `user@example.com`) rather than a file
+reference. A set membership test is much cheaper than running a regex on a
+single character.
 """
 
 INPUT_HIGHLIGHT_PATTERN = re.compile(
@@ -51,20 +54,26 @@ in `UserMessage.compose()` additionally checks `start == 0` before styling
 slash commands, so a `/` mid-string is not highlighted.
 """
 
-IMAGE_PLACEHOLDER_PATTERN = re.compile(r"\[image (?P<id>\d+)\]")
-"""Pattern for image placeholders with a named `id` capture group.
+MEDIA_PLACEHOLDER_PATTERN = re.compile(r"\[(?P<kind>image|video) (?P<id>\d+)\]")
+"""Pattern for image and video placeholders.
 
-Used to extract numeric IDs from placeholder tokens so the tracker can prune
-stale entries and compute the next available ID.
+Captures the media `kind` and numeric `id` so the tracker can find every
+referenced image and video in a single pass, prune stale entries, and compute
+the next available IDs.
 """
 
-VIDEO_PLACEHOLDER_PATTERN = re.compile(r"\[video (?P<id>\d+)\]")
-"""Pattern for video placeholders with a named `id` capture group.
 
-Used to extract numeric IDs from placeholder tokens so the tracker can prune
-stale entries and compute the next available ID.
+_MAX_PASTED_PATHS_LENGTH = 32_768
+"""Upper bound on paste payload length considered for file-drop parsing.
+
+Generous enough for dozens of dragged-and-dropped paths; anything longer is
+treated as ordinary text without being tokenized.
 """
 
+_PASTE_CONTROL_CHAR_PATTERN = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")
+"""ASCII control characters (other than tab and newlines) never present in
+dropped file paths."""
+
 
 class MediaTracker:
     """Track pasted images and videos in the current conversation."""
@@ -101,6 +110,7 @@ class MediaTracker:
         """
         placeholder = f"[image {self.next_image_id}]"
         image_data.placeholder = placeholder
+        image_data.id = self.next_image_id
         self.images.append(image_data)
         self.next_image_id += 1
         return placeholder
@@ -116,25 +126,26 @@ class MediaTracker:
         """
         placeholder = f"[video {self.next_video_id}]"
         video_data.placeholder = placeholder
+        video_data.id = self.next_video_id
         self.videos.append(video_data)
         self.next_video_id += 1
         return placeholder
 
-    def get_images(self) -> list[ImageData]:
+    def get_images(self) -> tuple[ImageData, ...]:
         """Get all tracked images.
 
         Returns:
-            Copy of the list of tracked images.
+            Immutable snapshot of the tracked images.
         """
-        return self.images.copy()
+        return tuple(self.images)
 
-    def get_videos(self) -> list[VideoData]:
+    def get_videos(self) -> tuple[VideoData, ...]:
         """Get all tracked videos.
 
         Returns:
-            Copy of the list of tracked videos.
+            Immutable snapshot of the tracked videos.
         """
-        return self.videos.copy()
+        return tuple(self.videos)
 
     def clear(self) -> None:
         """Clear all tracked media and reset counters."""
@@ -149,53 +160,24 @@ class MediaTracker:
         Args:
             text: Current input text shown to the user.
         """
-        # Extract all image and video placeholders from text
-        image_placeholders = {
-            match.group(0) for match in IMAGE_PLACEHOLDER_PATTERN.finditer(text)
-        }
-        video_placeholders = {
-            match.group(0) for match in VIDEO_PLACEHOLDER_PATTERN.finditer(text)
-        }
-
-        if not image_placeholders and not video_placeholders:
+        # Extract all image and video placeholder IDs from text
+        image_ids: set[int] = set()
+        video_ids: set[int] = set()
+        for match in MEDIA_PLACEHOLDER_PATTERN.finditer(text):
+            ids = image_ids if match.group("kind") == "image" else video_ids
+            ids.add(int(match.group("id")))
+
+        if not image_ids and not video_ids:
             self.clear()
             return
 
-        # Prune images
-        self.images = [
-            img for img in self.images if img.placeholder in image_placeholders
-        ]
-
-        # Prune videos
-        self.videos = [
-            vid for vid in self.videos if vid.placeholder in video_placeholders
-        ]
-
-        # Reset counters if no media remains
-        if not self.images:
-            self.next_image_id = 1
-        if not self.videos:
-            self.next_video_id = 1
-
-        # Update counters based on surviving media
-        max_image_id = 0
-        for image in self.images:
-            match = IMAGE_PLACEHOLDER_PATTERN.fullmatch(image.placeholder)
-            if match is None:
-                continue
-            max_image_id = max(max_image_id, int(match.group("id")))
-
-        max_video_id = 0
-        for video in self.videos:
-            match = VIDEO_PLACEHOLDER_PATTERN.fullmatch(video.placeholder)
-            if match is None:
-                continue
-            max_video_id = max(max_video_id, int(match.group("id")))
-
-        if max_image_id:
-            self.next_image_id = max_image_id + 1
-        if max_video_id:
-            self.next_video_id = max_video_id + 1
+        # Prune media no longer referenced
+        self.images = [img for img in self.images if img.id in image_ids]
+        self.videos = [vid for vid in self.videos if vid.id in video_ids]
+
+        # Continue numbering after the highest surviving ID (or restart at 1)
+        self.next_image_id = max((img.id for img in self.images), default=0) + 1
+        self.next_video_id = max((vid.id for vid in self.videos), default=0) + 1
 
 
 # Keep ImageTracker as an alias for backward compatibility
@@ -231,8 +213,8 @@ def parse_file_mentions(text: str) -> tuple[str, list[Path]]:
     files = []
     for match in matches:
         # Skip if this looks like an email address
-        text_before = text[: match.start()]
-        if text_before and EMAIL_PREFIX_PATTERN.search(text_before):
+        start = match.start()
+        if start > 0 and text[start - 1] in EMAIL_PREFIX_CHARS:
             continue
 
         raw_path = match.group("path")
@@ -245,7 +227,7 @@ def parse_file_mentions(text: str) -> tuple[str, list[Path]]:
                 path = Path.cwd() / path
 
             resolved = path.resolve()
-            if resolved.exists() and resolved.is_file():
+            if _is_regular_file(resolved):
                 files.append(resolved)
             else:
                 console.print(f"[yellow]Warning: File not found: {raw_path}[/yellow]")
@@ -278,7 +260,16 @@ def parse_pasted_file_paths(text: str) -> list[Path]:
     if not payload:
         return []
 
-    tokens: list[str] = []
+    # Cheap rejects for payloads that can't be a file drop, so long text pastes
+    # skip shell tokenization entirely
+    if len(payload) > _MAX_PASTED_PATHS_LENGTH:
+        return []
+    if _PASTE_CONTROL_CHAR_PATTERN.search(payload):
+        return []
+
+    # Tokenize and validate line by line so ordinary text bails out on its first
+    # token instead of being fully tokenized up front
+    paths: list[Path] = []
     for raw_line in payload.splitlines():
         line = raw_line.strip()
         if not line:
@@ -286,26 +277,37 @@ def parse_pasted_file_paths(text: str) -> list[Path]:
         line_tokens = _split_paste_line(line)
         if not line_tokens:
             return []
-        tokens.extend(line_tokens)
+        for token in line_tokens:
+            path = _token_to_path(token)
+            if path is None:
+                return []
+            try:
+                resolved = path.expanduser().resolve()
+            except (OSError, RuntimeError) as e:
+                logger.debug("Path resolution failed for token %r: %s", token, e)
+                return []
+            if not _is_regular_file(resolved):
+                return []
+            paths.append(resolved)
 
-    if not tokens:
-        return []
+    return paths
 
-    paths: list[Path] = []
-    for token in tokens:
-        path = _token_to_path(token)
-        if path is None:
-            return []
-        try:
-            resolved = path.expanduser().resolve()
-        except (OSError, RuntimeError) as e:
-            logger.debug("Path resolution failed for token %r: %s", token, e)
-            return []
-        if not resolved.exists() or not resolved.is_file():
-            return []
-        paths.append(resolved)
 
-    return paths
+def _is_regular_file(path: Path) -> bool:
+    """Check whether a path exists and is a regular file with a single `stat`.
+
+    Equivalent to `path.exists() and path.is_file()`, which would `stat` twice.
+
+    Args:
+        path: Path to check.
+
+    Returns:
+        `True` if the path refers to an existing regular file.
+    """
+    try:
+        return stat.S_ISREG(path.stat().st_mode)
+    except (OSError, ValueError):
+        return False
 
 
 def _split_paste_line(line: str) -> list[str]:
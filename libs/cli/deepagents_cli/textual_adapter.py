@@ -13,6 +13,8 @@ from typing import TYPE_CHECKING, Any
 if TYPE_CHECKING:
     from collections.abc import Awaitable, Callable
 
+    from deepagents_cli.image_utils import ImageData, VideoData
+
 from langchain.agents.middleware.human_in_the_loop import (
     ApproveDecision,
     EditDecision,
@@ -293,8 +295,8 @@ async def execute_task_textual(
         final_input = prompt_text
 
     # Include images and videos in the message content
-    images_to_send = []
-    videos_to_send = []
+    images_to_send: tuple[ImageData, ...] = ()
+    videos_to_send: tuple[VideoData, ...] = ()
     if image_tracker:
         images_to_send = image_tracker.get_images()
         videos_to_send = image_tracker.get_videos()
@@ -23,7 +23,7 @@ from deepagents_cli.config import (
     _detect_charset_mode,
     get_glyphs,
 )
-from deepagents_cli.input import EMAIL_PREFIX_PATTERN, INPUT_HIGHLIGHT_PATTERN
+from deepagents_cli.input import EMAIL_PREFIX_CHARS, INPUT_HIGHLIGHT_PATTERN
 from deepagents_cli.tool_display import format_tool_display
 from deepagents_cli.widgets._links import open_style_link
 from deepagents_cli.widgets.diff import format_diff_textual
@@ -159,10 +159,12 @@ class UserMessage(Static):
             token = match.group()
 
             # Skip @mentions that look like email addresses
-            if token.startswith("@") and start > 0:
-                char_before = content[start - 1]
-                if EMAIL_PREFIX_PATTERN.match(char_before):
-                    continue
+            if (
+                token.startswith("@")
+                and start > 0
+                and content[start - 1] in EMAIL_PREFIX_CHARS
+            ):
+                continue
 
             # Add text before the match (unstyled)
             if start > last_end:
@@ -1299,7 +1299,7 @@ class TestDroppedImagePaste:
             # Forward-delete removes the placeholder token but not the
             # trailing space (unlike backspace which catches it).
             assert "[image" not in chat._text_area.text
-            assert app.tracker.get_images() == []
+            assert app.tracker.get_images() == ()
             assert app.tracker.next_id == 1
 
     @pytest.mark.asyncio
@@ -1324,7 +1324,7 @@ class TestDroppedImagePaste:
             await pilot.pause()
 
             assert chat._text_area.text == ""
-            assert app.tracker.get_images() == []
+            assert app.tracker.get_images() == ()
             assert app.tracker.next_id == 1
 
     @pytest.mark.asyncio
@@ -1387,7 +1387,7 @@ class TestDroppedImagePaste:
             await pilot.pause()
 
             assert chat._text_area.text == "hello world"
-            assert app.tracker.get_images() == []
+            assert app.tracker.get_images() == ()
 
     @pytest.mark.asyncio
     async def test_paste_image_path_attaches_image_and_inserts_placeholder(
@@ -1426,7 +1426,7 @@ class TestDroppedImagePaste:
             await pilot.pause()
 
             assert chat._text_area.text.endswith(str(file_path).lstrip("/"))
-            assert app.tracker.get_images() == []
+            assert app.tracker.get_images() == ()
 
     @pytest.mark.asyncio
     async def test_submit_absolute_path_without_paste_event_attaches_image(
@@ -1486,7 +1486,7 @@ class TestDroppedImagePaste:
 
             # The tracker should have synced and cleared images since
             # the new text has no placeholders.
-            assert app.tracker.get_images() == []
+            assert app.tracker.get_images() == ()
             assert app.tracker.next_id == 1
 
     @pytest.mark.asyncio
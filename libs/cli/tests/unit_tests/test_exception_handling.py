@@ -298,11 +298,8 @@ class TestImageUtilsExceptionHandling:
         with (
             patch("deepagents_cli.image_utils._get_executable") as mock_exec,
             patch("subprocess.run") as mock_run,
-            patch("tempfile.mkstemp") as mock_mkstemp,
-            patch("os.close"),
         ):
             mock_exec.return_value = "/usr/bin/osascript"
-            mock_mkstemp.return_value = (5, "/tmp/test.png")
             mock_run.side_effect = subprocess.TimeoutExpired(cmd="osascript", timeout=2)
 
             with caplog.at_level(logging.DEBUG):
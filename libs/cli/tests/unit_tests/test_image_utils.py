@@ -8,6 +8,7 @@ import io
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
+import pytest
 from PIL import Image
 
 from deepagents_cli.image_utils import (
@@ -50,6 +51,16 @@ class TestImageData:
         assert result["type"] == "image_url"
         assert result["image_url"]["url"].startswith("data:image/jpeg;base64,")
 
+    def test_to_message_content_reuses_data_url(self) -> None:
+        """Repeated conversions should hand back the same cached URL string."""
+        image = ImageData(base64_data="abc123", format="png", placeholder="[image 1]")
+
+        first = image.to_message_content()["image_url"]["url"]
+        second = image.to_message_content()["image_url"]["url"]
+
+        assert first == "data:image/png;base64,abc123"
+        assert first is second
+
 
 class TestImageTracker:
     """Tests for ImageTracker class."""
@@ -69,17 +80,19 @@ class TestImageTracker:
         assert img1.placeholder == "[image 1]"
         assert img2.placeholder == "[image 2]"
 
-    def test_get_images_returns_copy(self) -> None:
-        """Test that get_images returns a copy, not the original list."""
+    def test_get_images_returns_snapshot(self) -> None:
+        """Test that get_images returns an immutable snapshot of tracked images."""
         tracker = ImageTracker()
         img = ImageData(base64_data="abc", format="png", placeholder="")
         tracker.add_image(img)
 
         images = tracker.get_images()
-        images.clear()  # Modify the returned list
+        assert images == (img,)
 
-        # Original should be unchanged
-        assert len(tracker.get_images()) == 1
+        # Later additions should not leak into an earlier snapshot
+        tracker.add_image(ImageData(base64_data="def", format="png", placeholder=""))
+        assert len(images) == 1
+        assert len(tracker.get_images()) == 2
 
     def test_clear_resets_counter(self) -> None:
         """Test that clear resets both images and counter."""
@@ -163,6 +176,20 @@ class TestEncodeImageToBase64:
         decoded = base64.b64decode(result)
         assert decoded == png_bytes
 
+    def test_image_path_encoding_matches_in_memory_encoding(
+        self, tmp_path: Path
+    ) -> None:
+        """Streaming a multi-chunk image file should match encoding it in one shot."""
+        # Not a multiple of the chunk size, so the final chunk needs padding
+        data = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 500 + b"tail"
+        file_path = tmp_path / "blob.png"
+        file_path.write_bytes(data)
+
+        result = get_image_from_path(file_path)
+
+        assert result is not None
+        assert result.base64_data == encode_image_to_base64(data)
+
 
 class TestCreateMultimodalContent:
     """Tests for creating multimodal message content."""
@@ -261,6 +288,24 @@ class TestGetClipboardImage:
         assert result.format == "png"
         assert len(result.base64_data) > 0
 
+    @patch("deepagents_cli.image_utils.sys.platform", "darwin")
+    @patch("deepagents_cli.image_utils._get_clipboard_via_osascript")
+    @patch("deepagents_cli.image_utils.subprocess.run")
+    @patch("deepagents_cli.image_utils._get_executable")
+    def test_pngpaste_non_png_output_falls_back(
+        self,
+        mock_get_executable: MagicMock,
+        mock_run: MagicMock,
+        mock_osascript: MagicMock,
+    ) -> None:
+        """Output without a PNG signature should be rejected before encoding."""
+        mock_get_executable.return_value = "/usr/local/bin/pngpaste"
+        mock_run.return_value = MagicMock(returncode=0, stdout=b"not a png")
+        mock_osascript.return_value = None
+
+        assert get_clipboard_image() is None
+        mock_osascript.assert_called_once()
+
     @patch("deepagents_cli.image_utils.sys.platform", "darwin")
     @patch("deepagents_cli.image_utils.subprocess.run")
     @patch("deepagents_cli.image_utils._get_executable")
@@ -273,15 +318,67 @@ class TestGetClipboardImage:
             "/usr/bin/osascript" if name == "osascript" else None
         )
 
-        # osascript clipboard info returns no image info (no "pngf" in output)
-        mock_run.return_value = MagicMock(returncode=0, stdout="text data")
+        # osascript script writes nothing when the clipboard holds no image
+        mock_run.return_value = MagicMock(returncode=0, stdout=b"")
 
         result = get_clipboard_image()
 
         # Should return None since clipboard has no image
         assert result is None
-        # Should have tried osascript (clipboard info check)
+        # Should have tried osascript exactly once (probe and fetch are fused)
+        assert mock_run.call_count == 1
+
+    @patch("deepagents_cli.image_utils.sys.platform", "darwin")
+    @patch("deepagents_cli.image_utils.subprocess.run")
+    @patch("deepagents_cli.image_utils._get_executable")
+    def test_osascript_reads_image_from_stdout(
+        self, mock_get_executable: MagicMock, mock_run: MagicMock
+    ) -> None:
+        """The osascript fallback should read image bytes from the stdout pipe."""
+        mock_get_executable.side_effect = lambda name: (
+            "/usr/bin/osascript" if name == "osascript" else None
+        )
+
+        img = Image.new("RGB", (10, 10), color="green")
+        buffer = io.BytesIO()
+        img.save(buffer, format="PNG")
+        png_bytes = buffer.getvalue()
+
+        mock_run.return_value = MagicMock(returncode=0, stdout=png_bytes)
+
+        result = get_clipboard_image()
+
+        assert result is not None
+        assert result.format == "png"
         assert mock_run.call_count == 1
+        script = mock_run.call_args.args[0][2]
+        assert 'POSIX file "/dev/stdout"' in script
+        assert base64.b64decode(result.base64_data) == png_bytes
+
+    @patch("deepagents_cli.image_utils.sys.platform", "darwin")
+    @patch("deepagents_cli.image_utils.subprocess.run")
+    @patch("deepagents_cli.image_utils._get_executable")
+    def test_osascript_converts_tiff_to_png(
+        self, mock_get_executable: MagicMock, mock_run: MagicMock
+    ) -> None:
+        """TIFF clipboard data should be re-encoded as PNG."""
+        mock_get_executable.side_effect = lambda name: (
+            "/usr/bin/osascript" if name == "osascript" else None
+        )
+
+        img = Image.new("RGB", (10, 10), color="green")
+        buffer = io.BytesIO()
+        img.save(buffer, format="TIFF")
+
+        mock_run.return_value = MagicMock(returncode=0, stdout=buffer.getvalue())
+
+        result = get_clipboard_image()
+
+        assert result is not None
+        assert result.format == "png"
+        decoded = Image.open(io.BytesIO(base64.b64decode(result.base64_data)))
+        assert decoded.format == "PNG"
+        assert decoded.size == (10, 10)
 
     @patch("deepagents_cli.image_utils.sys.platform", "darwin")
     @patch("deepagents_cli.image_utils._get_clipboard_via_osascript")
@@ -338,6 +435,56 @@ class TestGetImageFromPath:
         assert result is not None
         assert result.format == "jpeg"
 
+    @pytest.mark.parametrize(
+        ("pil_format", "expected"),
+        [("GIF", "gif"), ("WEBP", "webp"), ("BMP", "bmp")],
+    )
+    def test_get_image_from_path_detects_format_from_signature(
+        self, tmp_path: Path, pil_format: str, expected: str
+    ) -> None:
+        """Formats should come from magic bytes, not the file extension."""
+        img_path = tmp_path / "misnamed.png"
+        Image.new("RGB", (4, 4), color="blue").save(img_path, format=pil_format)
+
+        result = get_image_from_path(img_path)
+
+        assert result is not None
+        assert result.format == expected
+        assert base64.b64decode(result.base64_data) == img_path.read_bytes()
+
+    def test_get_image_from_path_text_with_image_suffix_returns_none(
+        self, tmp_path: Path
+    ) -> None:
+        """Files without an image signature are rejected despite the suffix."""
+        file_path = tmp_path / "fake.png"
+        file_path.write_text("definitely not a png")
+
+        assert get_image_from_path(file_path) is None
+
+    def test_get_image_from_path_text_starting_with_bm_returns_none(
+        self, tmp_path: Path
+    ) -> None:
+        """Text that happens to start with 'BM' is not mistaken for a bitmap."""
+        file_path = tmp_path / "notes.txt"
+        file_path.write_text("BMW service notes\n")
+
+        assert get_image_from_path(file_path) is None
+
+    def test_get_image_from_path_converts_unsniffed_format_to_png(
+        self, tmp_path: Path
+    ) -> None:
+        """Formats without a sniffed signature (e.g. TIFF) fall back to Pillow."""
+        img_path = tmp_path / "scan.tiff"
+        Image.new("RGB", (6, 4), color="red").save(img_path, format="TIFF")
+
+        result = get_image_from_path(img_path)
+
+        assert result is not None
+        assert result.format == "png"
+        decoded = Image.open(io.BytesIO(base64.b64decode(result.base64_data)))
+        assert decoded.format == "PNG"
+        assert decoded.size == (6, 4)
+
 
 class TestSyncToTextWithIDGaps:
     """Tests for ImageTracker.sync_to_text with non-contiguous IDs."""
@@ -414,6 +561,26 @@ class TestGetVideoFromPath:
         assert result.placeholder == "[video]"
         assert base64.b64decode(result.base64_data) == mp4_content
 
+    def test_get_video_from_path_streams_large_file(self, tmp_path: Path) -> None:
+        """Videos larger than one encode chunk should round-trip intact."""
+        content = b"\x00\x00\x00\x14ftypmp42" + bytes(range(256)) * 1000
+        video_path = tmp_path / "large.mp4"
+        video_path.write_bytes(content)
+
+        result = get_video_from_path(video_path)
+
+        assert result is not None
+        assert base64.b64decode(result.base64_data) == content
+
+    def test_get_video_from_path_truncated_header_returns_none(
+        self, tmp_path: Path
+    ) -> None:
+        """Files too short to carry a signature should be rejected."""
+        video_path = tmp_path / "tiny.mp4"
+        video_path.write_bytes(b"\x00\x00")
+
+        assert get_video_from_path(video_path) is None
+
     def test_get_video_from_path_jpg_returns_none(self, tmp_path: Path) -> None:
         """Non-video files should return None."""
         file_path = tmp_path / "test.jpg"
@@ -470,17 +637,19 @@ class TestMediaTrackerVideo:
         assert vid1.placeholder == "[video 1]"
         assert vid2.placeholder == "[video 2]"
 
-    def test_get_videos_returns_copy(self) -> None:
-        """Test that get_videos returns a copy, not the original list."""
+    def test_get_videos_returns_snapshot(self) -> None:
+        """Test that get_videos returns an immutable snapshot of tracked videos."""
         tracker = MediaTracker()
         vid = VideoData(base64_data="abc", format="mp4", placeholder="")
         tracker.add_video(vid)
 
         videos = tracker.get_videos()
-        videos.clear()  # Modify the returned list
+        assert videos == (vid,)
 
-        # Original should be unchanged
-        assert len(tracker.get_videos()) == 1
+        # Later additions should not leak into an earlier snapshot
+        tracker.add_video(VideoData(base64_data="def", format="mp4", placeholder=""))
+        assert len(videos) == 1
+        assert len(tracker.get_videos()) == 2
 
     def test_clear_resets_video_counter(self) -> None:
         """Test that clear resets both videos and video counter."""
@@ -555,6 +724,22 @@ class TestMediaTrackerVideo:
         assert len(tracker.images) == 1
         assert len(tracker.videos) == 1
 
+    def test_sync_to_text_does_not_cross_match_media_kinds(self) -> None:
+        """A `[video N]` placeholder must not keep `[image N]` alive."""
+        tracker = MediaTracker()
+
+        img = ImageData(base64_data="img", format="png", placeholder="")
+        vid = VideoData(base64_data="vid", format="mp4", placeholder="")
+
+        tracker.add_image(img)
+        tracker.add_video(vid)
+        tracker.sync_to_text("only [video 1] remains")
+
+        assert tracker.images == []
+        assert tracker.next_image_id == 1
+        assert tracker.videos == [vid]
+        assert tracker.next_video_id == 2
+
     def test_sync_to_text_clears_all_when_no_placeholders(self) -> None:
         """Sync with no placeholders should clear both images and videos."""
         tracker = MediaTracker()
@@ -1,5 +1,6 @@
 """Unit tests for input parsing utilities."""
 
+import shlex
 from pathlib import Path
 
 import pytest
@@ -285,6 +286,34 @@ def test_parse_pasted_file_paths_returns_empty_for_text_payload() -> None:
     assert parse_pasted_file_paths("please inspect this image") == []
 
 
+def test_parse_pasted_file_paths_rejects_control_characters(tmp_path: Path) -> None:
+    """Payloads containing control characters should never be treated as paths."""
+    img = tmp_path / "a.png"
+    img.write_bytes(b"img")
+
+    assert parse_pasted_file_paths(f"{img}\x1b[0m") == []
+
+
+def test_parse_pasted_file_paths_rejects_oversized_payload(
+    tmp_path: Path, mocker
+) -> None:
+    """Very long pastes should be rejected without shell tokenization."""
+    img = tmp_path / "a.png"
+    img.write_bytes(b"img")
+    split = mocker.patch("deepagents_cli.input.shlex.split")
+
+    assert parse_pasted_file_paths(f"{img}\n" * 5000) == []
+    split.assert_not_called()
+
+
+def test_parse_pasted_file_paths_stops_at_first_invalid_line(mocker) -> None:
+    """Multi-line prose should stop tokenizing after the first bad token."""
+    split = mocker.patch("deepagents_cli.input.shlex.split", wraps=shlex.split)
+
+    assert parse_pasted_file_paths("first line\nsecond line\nthird line") == []
+    split.assert_called_once()
+
+
 def test_parse_pasted_file_paths_returns_empty_for_missing_file(tmp_path: Path) -> None:
     """Missing dropped files should fall back to regular text paste."""
     missing = tmp_path / "missing.png"
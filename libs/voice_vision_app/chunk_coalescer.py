@@ -0,0 +1,60 @@
+import asyncio
+
+import orjson
+
+# Outbound chunks are coalesced for up to this long (or until this many characters
+# are buffered) so fast token streams aren't sent as one frame per token
+COALESCE_WINDOW_S = 0.02
+COALESCE_MAX_CHARS = 2048
+
+async def send_frame(websocket, message: dict) -> None:
+    # orjson produces UTF-8 bytes directly; the Node client JSON.parses either frame type
+    await websocket.send_bytes(orjson.dumps(message))
+
+class ChunkCoalescer:
+    """Background writer that batches `{"chunk": ...}` frames for one turn."""
+
+    def __init__(self, websocket):
+        self._websocket = websocket
+        self._queue: asyncio.Queue[str | None] = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+        self.error: Exception | None = None
+
+    def put(self, text: str) -> None:
+        self._queue.put_nowait(text)
+
+    async def close(self) -> None:
+        """Flush anything still queued and stop the writer."""
+        self._queue.put_nowait(None)
+        await self._task
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        closed = False
+        while not closed:
+            first = await self._queue.get()
+            if first is None:
+                return
+
+            parts = [first]
+            size = len(first)
+            deadline = loop.time() + COALESCE_WINDOW_S
+            while size < COALESCE_MAX_CHARS:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    closed = True
+                    break
+                parts.append(item)
+                size += len(item)
+
+            try:
+                await send_frame(self._websocket, {"chunk": "".join(parts)})
+            except Exception as e:
+                self.error = e
+                return
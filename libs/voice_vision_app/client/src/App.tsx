@@ -107,23 +107,19 @@ function App() {
 
           ctx.drawImage(video, 0, 0, canvas.width, canvas.height);
 
-          // Get base64 JPEG from canvas
-          const dataUrl = canvas.toDataURL('image/jpeg', 0.8);
-          if (!dataUrl.includes(',')) return;
-
-          const base64data = dataUrl.split(',')[1];
-
-          fetch('http://localhost:8080/vision', {
-            method: 'POST',
-            signal: currentAbort.signal,
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({
-              video_base64: base64data,
-              format: 'jpeg' // Use 'jpeg' to signify it's a single image frame now
-            })
-          }).catch(() => {
-            // Silently ignore aborts and fetch failures as they happen every second
-          });
+          // Post the JPEG bytes directly; skips the base64 data URL round-trip
+          const signal = currentAbort.signal;
+          canvas.toBlob((blob) => {
+            if (!blob || signal.aborted) return;
+            fetch('http://localhost:8080/vision/raw', {
+              method: 'POST',
+              signal,
+              headers: { 'Content-Type': 'image/jpeg' },
+              body: blob
+            }).catch(() => {
+              // Silently ignore aborts and fetch failures as they happen every second
+            });
+          }, 'image/jpeg', 0.8);
 
         } catch (e) {
           // Silent catch for canvas errors
@@ -0,0 +1 @@
+"""Makes the bridge's top-level modules importable from `tests/`."""
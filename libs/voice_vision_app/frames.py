@@ -0,0 +1,105 @@
+import base64
+import itertools
+import os
+import threading
+
+# Latest camera frame, written by /vision and read by the Vision tool
+FRAME_PATH = os.path.join(os.getcwd(), "latest_frame.jpg")
+
+# Frames are numbered in arrival order; a frame that finishes writing after a
+# newer one has already been published is dropped instead of overwriting it
+_frame_ids = itertools.count(1)
+_latest_frame_id = 0
+_frame_lock = threading.Lock()
+
+def next_frame_id() -> int:
+    """Reserve the id for an upload; call this when the request arrives."""
+    return next(_frame_ids)
+
+def write_frame(image_data: bytes, frame_id: int) -> bool:
+    """Atomically replace the latest frame on disk unless a newer one has landed.
+
+    Writing to a temp file and renaming means the Vision tool only ever sees a
+    complete frame, never a half-written one.
+
+    Returns:
+        Whether the frame was published (`False` if it was already stale).
+    """
+    global _latest_frame_id
+    if frame_id < _latest_frame_id:
+        return False
+
+    # One temp file per worker thread so overlapping uploads don't interleave
+    tmp_path = f"{FRAME_PATH}.{threading.get_ident()}.tmp"
+    # Raw fd write: one syscall for a whole frame, no Python file-object buffer
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+    try:
+        view = memoryview(image_data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+    with _frame_lock:
+        if frame_id < _latest_frame_id:
+            os.remove(tmp_path)
+            return False
+        os.replace(tmp_path, FRAME_PATH)
+        _latest_frame_id = frame_id
+    return True
+
+def save_frame(video_base64: str, frame_id: int) -> bool:
+    """Decode a base64 frame and write it as the latest frame."""
+    return write_frame(base64.b64decode(video_base64), frame_id)
+
+# Snapshots handed out as file:// URLs are kept this long (in tool calls) so
+# recent thread history keeps pointing at the frame each call actually saw
+MAX_SNAPSHOTS = 32
+_snapshots: list[str] | None = None
+_snapshot_lock = threading.Lock()
+
+def snapshot_frame() -> str:
+    """Pin the current frame under a path that never changes and return it.
+
+    `/vision` keeps replacing FRAME_PATH, so a URL to it would show later
+    callers a different image. A hardlink pins the frame's inode without
+    copying; the name comes from the linked inode itself, so a frame that was
+    already snapshotted maps to the same file. Only the newest MAX_SNAPSHOTS
+    snapshots are kept.
+    """
+    global _snapshots
+    snapshot_dir = os.path.join(os.path.dirname(FRAME_PATH), "frame_snapshots")
+    os.makedirs(snapshot_dir, exist_ok=True)
+
+    tmp_path = os.path.join(snapshot_dir, f".{threading.get_ident()}.tmp")
+    if os.path.lexists(tmp_path):
+        os.remove(tmp_path)
+    os.link(FRAME_PATH, tmp_path)
+    st = os.stat(tmp_path)
+    # A retained snapshot holds its inode, so the number can't be reused while
+    # the name exists
+    path = os.path.join(snapshot_dir, f"frame_{st.st_ino}_{st.st_mtime_ns}.jpg")
+    if os.path.exists(path):
+        # rename() between two links to the same inode is a no-op, so drop ours
+        os.remove(tmp_path)
+    else:
+        os.replace(tmp_path, path)
+
+    with _snapshot_lock:
+        if _snapshots is None:
+            # Pick up snapshots left behind by a previous run so they get pruned too
+            existing = [
+                os.path.join(snapshot_dir, name)
+                for name in os.listdir(snapshot_dir)
+                if name.startswith("frame_") and name.endswith(".jpg")
+            ]
+            _snapshots = sorted(existing, key=os.path.getmtime)
+        if path in _snapshots:
+            _snapshots.remove(path)
+        _snapshots.append(path)
+        while len(_snapshots) > MAX_SNAPSHOTS:
+            try:
+                os.remove(_snapshots.pop(0))
+            except FileNotFoundError:
+                pass
+    return path
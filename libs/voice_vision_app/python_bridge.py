@@ -1,10 +1,13 @@
-import asyncio
-import json
+import base64
 import logging
+import os
 import sys
-from fastapi import FastAPI, WebSocket
+import anyio
+from fastapi import FastAPI, Request, WebSocket
+import orjson
 import uvicorn
 from contextlib import asynccontextmanager
+from pathlib import Path
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -13,31 +16,84 @@ from deepagents_cli.config import create_model
 from langchain_core.tools import BaseTool
 from langchain_core.messages import HumanMessage
 
+from chunk_coalescer import ChunkCoalescer, send_frame
+from frames import FRAME_PATH, next_frame_id, save_frame, snapshot_frame, write_frame
+from reasoning_strip import ReasoningStripper
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("python_bridge")
 
+# With DA_VISION_INLINE=0 the Vision tool returns a file:// URL to a per-frame
+# snapshot instead of an inline base64 data URL. Only useful when the model
+# server runs on this host and may read local media (e.g. vLLM
+# --allowed-local-media-path); hosted APIs need the inline default.
+VISION_INLINE = os.environ.get("DA_VISION_INLINE", "1") != "0"
+
+# Data URL of the last frame the Vision tool encoded, keyed by its stat identity
+_frame_url_cache: dict = {"key": None, "url": None}
+
+# Chat config for clients that don't send a session id
+DEFAULT_CHAT_CONFIG = {"configurable": {"thread_id": "voice_vision_session"}}
+
+# The model is created with enable_thinking=False, so reasoning shouldn't leak
+# into content; set DA_STRIP_REASONING=0 to skip the strip when the provider
+# reliably honours that
+STRIP_REASONING = os.environ.get("DA_STRIP_REASONING", "1") == "1"
+
+def _frame_key(st: os.stat_result) -> tuple:
+    # Frames are swapped in with os.replace, so a new frame always gets a new
+    # inode; the encoded data URL is reused until this key changes
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+def _frame_message(url: str) -> list[dict]:
+    return [
+        {"type": "text", "text": "Here is the most recent snapshot from the user's camera:"},
+        {"type": "image_url", "image_url": {"url": url}}
+    ]
+
 class CameraVision(BaseTool):
     name: str = "Vision"
     description: str = "Use this tool to see the most recent frame from the user's camera when they ask you what you see. It returns the image data."
 
     def _run(self) -> list[dict]:
-        import os
-        import base64
-        frame_path = os.path.join(os.getcwd(), "latest_frame.jpg")
-        if not os.path.exists(frame_path):
+        try:
+            st = os.stat(FRAME_PATH)
+        except FileNotFoundError:
             return [{"type": "text", "text": "The camera frame is not available yet."}]
+        except Exception as e:
+            return [{"type": "text", "text": f"Error reading camera frame: {e}"}]
 
         try:
-            with open(frame_path, "rb") as f:
-                image_bytes = f.read()
-            b64_img = base64.b64encode(image_bytes).decode('utf-8')
-            return [
-                {"type": "text", "text": "Here is the most recent snapshot from the user's camera:"},
-                {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{b64_img}"}}
-            ]
+            if not VISION_INLINE:
+                return _frame_message(Path(snapshot_frame()).as_uri())
+
+            key = _frame_key(st)
+            if _frame_url_cache["key"] != key:
+                with open(FRAME_PATH, "rb") as f:
+                    image_bytes = f.read()
+                b64_img = base64.b64encode(image_bytes).decode('utf-8')
+                _frame_url_cache["url"] = f"data:image/jpeg;base64,{b64_img}"
+                _frame_url_cache["key"] = key
+            return _frame_message(_frame_url_cache["url"])
         except Exception as e:
             return [{"type": "text", "text": f"Error reading camera frame: {e}"}]
 
+    async def _arun(self) -> list[dict]:
+        # BaseTool's default _arun always hops to an executor thread. When the
+        # frame hasn't changed since the last call the answer is a single stat
+        # away, so serve it straight from the event loop.
+        if not VISION_INLINE:
+            # Snapshotting touches the filesystem; keep it off the loop
+            return await anyio.to_thread.run_sync(self._run)
+        try:
+            key = _frame_key(os.stat(FRAME_PATH))
+        except OSError:
+            key = None
+        if key is not None and _frame_url_cache["key"] == key:
+            return _frame_message(_frame_url_cache["url"])
+        # New frame: read and encode it off the event loop
+        return await anyio.to_thread.run_sync(self._run)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     global agent, backend
@@ -94,17 +150,26 @@ class VisionPayload(BaseModel):
 @app.post("/vision")
 async def process_vision(payload: VisionPayload):
     try:
-        # Save the latest 240p frame directly to disk so the vision tool can read it
-        import base64
-        import os
-
-        frame_path = os.path.join(os.getcwd(), "latest_frame.jpg")
-        image_data = base64.b64decode(payload.video_base64)
-
-        with open(frame_path, "wb") as f:
-            f.write(image_data)
+        # Save the latest 240p frame to disk so the vision tool can read it.
+        # Decode and write in a worker thread to keep the event loop free for /chat.
+        frame_id = next_frame_id()
+        saved = await anyio.to_thread.run_sync(save_frame, payload.video_base64, frame_id)
+        return {"status": "saved" if saved else "stale"}
+    except Exception as e:
+        logger.error(f"Vision endpoint error: {e}")
+        return {"error": str(e)}
 
-        return {"status": "saved"}
+@app.post("/vision/raw")
+async def process_vision_raw(request: Request):
+    # Same as /vision but the body is the JPEG itself, so there is no JSON parse
+    # or base64 decode and the upload is ~33% smaller
+    try:
+        frame_id = next_frame_id()
+        image_data = await request.body()
+        if not image_data:
+            return {"error": "Empty frame"}
+        saved = await anyio.to_thread.run_sync(write_frame, image_data, frame_id)
+        return {"status": "saved" if saved else "stale"}
     except Exception as e:
         logger.error(f"Vision endpoint error: {e}")
         return {"error": str(e)}
@@ -115,76 +180,76 @@ async def chat_endpoint(websocket: WebSocket):
     logger.info("Client connected to Python bridge")
     try:
         while True:
-            # We expect JSON payloads looking like {"text": "Hello"}
+            # We expect JSON payloads looking like {"text": "Hello", "session_id": "..."}
             data = await websocket.receive_text()
-            payload = json.loads(data)
+            payload = orjson.loads(data)
             user_text = payload.get("text", "")
 
             if not user_text:
                 continue
 
+            # The LLM provider opens a new socket per turn, so conversation continuity
+            # comes from the client's session id; older clients share one thread
+            session_id = payload.get("session_id")
+            config = (
+                {"configurable": {"thread_id": f"voice_vision_{session_id}"}}
+                if session_id
+                else DEFAULT_CHAT_CONFIG
+            )
+
             logger.info(f"User: {user_text}")
 
             # Stream the response from the agent
             # We configure max_concurrency or similar if needed, but astream works
             input_state = {"messages": [HumanMessage(content=user_text)]}
-            config = {"configurable": {"thread_id": "voice_vision_session"}}
 
-            full_response_chunks = []
-            async for event in agent.astream(input_state, config=config, stream_mode="messages"):
-                try:
-                    msg, metadata = event
+            # Forward content as soon as it arrives instead of waiting for the whole turn
+            stripper = ReasoningStripper(enabled=STRIP_REASONING)
+            coalescer = ChunkCoalescer(websocket)
+            sent_chunks = []
+            # Bound once per turn for the per-token loop below
+            feed = stripper.feed
+            put = coalescer.put
+            record = sent_chunks.append
+            try:
+                async for event in agent.astream(input_state, config=config, stream_mode="messages"):
+                    if coalescer.error:
+                        break
+                    try:
+                        msg, metadata = event
 
-                    # Logic to skip 'thinking' or 'reasoning' chunks
-                    if hasattr(msg, "additional_kwargs"):
-                        if msg.additional_kwargs.get("reasoning_content") or msg.additional_kwargs.get("thought"):
+                        # Logic to skip 'thinking' or 'reasoning' chunks
+                        extra = getattr(msg, "additional_kwargs", None)
+                        if extra and (extra.get("reasoning_content") or extra.get("thought")):
                             continue
 
-                    if hasattr(msg, "content") and msg.content:
-                        content = msg.content
-                        if content.strip():
-                             full_response_chunks.append(content)
-                except Exception as e:
-                    logger.error(f"Error during astream: {e}")
-
-            full_text = "".join(full_response_chunks).strip()
-
-            # Aggressive Reasoning Strip:
-            # If the model leaks reasoning into content, it often looks like:
-            # "The user sent... I should respond... Hello! ..."
-            # We look for common greeting transitions or the first occurrence of a clear greeting
-            # if the text starts with "The user" or "This is".
-
-            cleaned_text = full_text
-            if full_text.startswith(("The user", "This is", "I should")):
-                # Try to find the actual response starting after the first double newline or a greeting
-                import re
-                # Common greetings for Qwen/concise assistants
-                greetings = ["Hello", "Hi", "Greetings", "How can I help"]
-                found_greeting = False
-                for g in greetings:
-                    match = re.search(rf"\b{g}\b", full_text, re.IGNORECASE)
-                    if match:
-                        cleaned_text = full_text[match.start():].strip()
-                        found_greeting = True
-                        break
+                        content = getattr(msg, "content", None)
+                        if content and isinstance(content, str):
+                            out = feed(content)
+                            if out:
+                                put(out)
+                                record(out)
+                    except Exception as e:
+                        logger.error(f"Error during astream: {e}")
+
+                tail = stripper.flush()
+                if tail and not coalescer.error:
+                    coalescer.put(tail)
+                    sent_chunks.append(tail)
+            finally:
+                await coalescer.close()
 
-                if not found_greeting and "\n\n" in full_text:
-                    # Fallback to double newline
-                    cleaned_text = full_text.split("\n\n")[-1].strip()
+            if coalescer.error:
+                logger.error(f"WebSocket send failed (client likely disconnected), aborting generation: {coalescer.error}")
+                break
 
-            if cleaned_text:
-                logger.info(f"Final Agent Response (Cleaned): {cleaned_text}")
-                try:
-                    await websocket.send_json({"chunk": cleaned_text})
-                except Exception as e:
-                    logger.error(f"WebSocket send failed (client likely disconnected), aborting generation: {e}")
-                    break
+            if sent_chunks:
+                logger.info(f"Final Agent Response (Cleaned): {''.join(sent_chunks)}")
 
             logger.info("Agent response complete")
             # Indicate generation is complete for this turn
             try:
-                await websocket.send_json({"done": True})
+                await send_frame(websocket, {"done": True})
             except:
                 pass
 
@@ -194,4 +259,7 @@ async def chat_endpoint(websocket: WebSocket):
         logger.info("Client disconnected from Python bridge")
 
 if __name__ == "__main__":
+    # Single worker on purpose: the agent's conversation state and the frame
+    # ordering in write_frame are per process. uvicorn already picks uvloop and
+    # httptools when they are installed (`uvicorn[standard]`).
     uvicorn.run(app, host="127.0.0.1", port=8080)
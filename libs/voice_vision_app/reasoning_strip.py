@@ -0,0 +1,100 @@
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# Common greetings for Qwen/concise assistants, in priority order. Each one is
+# searched over the whole text before moving on to the next, so a lower-priority
+# greeting quoted inside the reasoning ("The user said hi...") doesn't end the
+# strip early. Compiled once at import instead of per turn.
+GREETING_PATTERNS = tuple(
+    re.compile(rf"\b{g}\b", re.IGNORECASE)
+    for g in ("Hello", "Hi", "Greetings", "How can I help")
+)
+
+# Openers that indicate the model leaked its reasoning into the response content
+REASONING_PREFIXES = ("The user", "This is", "I should")
+
+_warned_unstripped = False
+
+def find_greeting(text: str) -> re.Match | None:
+    """Return the match for the highest-priority greeting found in `text`."""
+    for pattern in GREETING_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return match
+    return None
+
+def strip_reasoning(text: str) -> str:
+    """Strip a leaked reasoning preface from a complete response."""
+    text = text.strip()
+    if text.startswith(REASONING_PREFIXES):
+        match = find_greeting(text)
+        if match:
+            return text[match.start():].strip()
+        if "\n\n" in text:
+            # Fallback to double newline
+            return text.split("\n\n")[-1].strip()
+    return text
+
+class ReasoningStripper:
+    """Aggressive reasoning strip applied incrementally to a streamed response.
+
+    If the model leaks reasoning into content, it often looks like:
+    "The user sent... I should respond... Hello! ..."
+    Chunks are held back only until we know whether the response opens with one
+    of `REASONING_PREFIXES`; once the real answer starts (or the response is
+    clearly not a reasoning preface) everything is forwarded as it arrives.
+    The output is always the same as `strip_reasoning` on the full response.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self._enabled = enabled
+        self._buffer = ""
+        self._committed = False
+
+    def feed(self, content: str) -> str:
+        """Return the part of `content` that can be sent to the client now."""
+        if self._committed:
+            return content
+
+        self._buffer += content
+        text = self._buffer.lstrip()
+        if not text:
+            return ""
+
+        if not self._enabled:
+            global _warned_unstripped
+            if not _warned_unstripped and text.startswith(REASONING_PREFIXES):
+                _warned_unstripped = True
+                logger.warning("Response looks like leaked reasoning; set DA_STRIP_REASONING=1 to strip it")
+            return self._commit(text)
+
+        if text.startswith(REASONING_PREFIXES):
+            # Only the top-priority greeting can be acted on mid-stream: its first
+            # occurrence is final, while a lower-priority match could still be
+            # overridden by a later one. A match at the very end of the buffer may
+            # still be growing ("Hello" -> "Hellos"), so wait for more.
+            match = GREETING_PATTERNS[0].search(text)
+            if match and match.end() < len(text):
+                return self._commit(text[match.start():])
+            return ""
+
+        if any(prefix.startswith(text) for prefix in REASONING_PREFIXES):
+            # Too short to tell yet ("The", "I sh", ...)
+            return ""
+
+        return self._commit(text)
+
+    def flush(self) -> str:
+        """Return whatever is still held back once the stream has ended."""
+        if self._committed:
+            return ""
+        if not self._enabled:
+            return self._commit(self._buffer.strip())
+        return self._commit(strip_reasoning(self._buffer))
+
+    def _commit(self, text: str) -> str:
+        self._committed = True
+        self._buffer = ""
+        return text
@@ -56,13 +56,16 @@ export class CustomWebSocketTTSProvider implements TTSProvider {
                             const scriptPath = path.join(currentDir, 'get_ref_floats.py');
 
                             // Execute the small python script to get floats matching tts_client.py
-                            const out = execSync(`cd /Users/adrozdov/repos/deepagents/libs/cli && uv run --with librosa --with numpy --with soundfile python ${scriptPath} ${this.refWavPath}`, {
-                                maxBuffer: 100 * 1024 * 1024,
-                                encoding: 'utf-8'
+                            const out = execSync(`cd /Users/adrozdov/repos/deepagents/libs/cli && uv run --with numpy --with soundfile --with soxr python ${scriptPath} ${this.refWavPath}`, {
+                                maxBuffer: 100 * 1024 * 1024
                             });
 
-                            const floats = JSON.parse(out);
-                            payload.ref_audio = floats;
+                            // Helper writes an 8-byte header (uint32 sample count, uint32 sample rate) then raw float32 LE samples
+                            const numSamples = out.readUInt32LE(0);
+                            const start = out.byteOffset + 8;
+                            // Slice copies into an aligned ArrayBuffer for the Float32Array view
+                            const floats = new Float32Array(out.buffer.slice(start, start + numSamples * 4));
+                            payload.ref_audio = Array.from(floats);
 
                             // Also read ref text if refText is a path
                             if (this.refText && fs.existsSync(this.refText)) {
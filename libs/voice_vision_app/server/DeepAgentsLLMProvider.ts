@@ -1,14 +1,39 @@
 import { LLMProvider, LLMRequest, LLMResult, LLMChunk } from '@llmrtc/llmrtc-core';
 import WebSocket from 'ws';
+import { randomUUID } from 'crypto';
 
 export class DeepAgentsLLMProvider implements LLMProvider {
     name = 'deepagents';
     private wsUrl: string;
+    // Ids of the live WebRTC connections, reported by server.ts from the
+    // server's 'connection'/'disconnect' events.
+    private connections = new Set<string>();
 
     constructor(options: { wsUrl?: string } = {}) {
         this.wsUrl = options.wsUrl || 'ws://127.0.0.1:8080/chat';
     }
 
+    connectionOpened(id: string): void {
+        this.connections.add(id);
+    }
+
+    connectionClosed(id: string): void {
+        this.connections.delete(id);
+    }
+
+    // The bridge keys its agent thread on this id, and each turn opens a fresh
+    // WebSocket, so it must identify the WebRTC connection, not the socket.
+    // LLM requests don't say which connection they belong to, so the id is
+    // only known while a single client is connected; with several, each turn
+    // gets a throwaway thread rather than risk mixing clients' conversations.
+    private sessionIdFor(): string {
+        if (this.connections.size === 1) {
+            return this.connections.values().next().value as string;
+        }
+        console.warn(`[llm] ${this.connections.size} connections active, turn runs without conversation history`);
+        return randomUUID();
+    }
+
     async complete(request: LLMRequest): Promise<LLMResult> {
         // Collect all text from stream
         let fullText = '';
@@ -24,6 +49,7 @@ export class DeepAgentsLLMProvider implements LLMProvider {
         // Convert WebRTC messages to user text
         const lastUserMessage = request.messages.filter(m => m.role === 'user').pop();
         let textToSend = lastUserMessage?.content || '';
+        const sessionId = this.sessionIdFor();
         if (!textToSend) {
             console.log(`[llm] Warning: Empty text received`);
         }
@@ -36,7 +62,7 @@ export class DeepAgentsLLMProvider implements LLMProvider {
         ws.on('open', () => {
             connected = true;
             console.log(`[llm] Connected to Python bridge, sending text: "${textToSend}"`);
-            ws.send(JSON.stringify({ text: textToSend }));
+            ws.send(JSON.stringify({ text: textToSend, session_id: sessionId }));
         });
 
         const signal = (request as any).abortSignal;
@@ -1,19 +1,41 @@
 import sys
 import json
-import librosa
+import struct
+import numpy as np
+import soundfile as sf
+import soxr
 
-def load_wav_floats(wav_path):
+TARGET_SR = 24000
+
+def load_wav_floats(wav_path, as_json=False):
     try:
-        audio, _ = librosa.load(wav_path, sr=24000)
-        # Output as a compact JSON list directly to stdout
-        json.dump(audio.tolist(), sys.stdout, separators=(',', ':'))
+        # soundfile + soxr is what librosa.load uses underneath, without
+        # pulling in librosa's scipy/numba import graph on every run
+        audio, sr = sf.read(wav_path, dtype="float32", always_2d=False)
+        if audio.ndim > 1:
+            audio = audio.mean(axis=1, dtype=np.float32)
+        if sr != TARGET_SR:
+            audio = soxr.resample(audio, sr, TARGET_SR, quality="HQ")
+        if as_json:
+            # Output as a compact JSON list directly to stdout
+            json.dump(audio.tolist(), sys.stdout, separators=(',', ':'))
+            return
+        # Default: little-endian header (sample count, sample rate) followed by
+        # raw float32 samples, so no per-sample float -> str conversion is needed
+        out = sys.stdout.buffer
+        out.write(struct.pack("<II", len(audio), TARGET_SR))
+        out.write(np.ascontiguousarray(audio, dtype="<f4").tobytes())
+        out.flush()
     except Exception as e:
         print(json.dumps({"error": str(e)}), file=sys.stderr)
         sys.exit(1)
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: get_ref_floats.py <path_to_wav>", file=sys.stderr)
+    args = sys.argv[1:]
+    as_json = "--json" in args
+    args = [a for a in args if a != "--json"]
+    if not args:
+        print("Usage: get_ref_floats.py [--json] <path_to_wav>", file=sys.stderr)
         sys.exit(1)
 
-    load_wav_floats(sys.argv[1])
+    load_wav_floats(args[0], as_json=as_json)
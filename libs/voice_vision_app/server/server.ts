@@ -6,11 +6,13 @@ import { DeepAgentsLLMProvider } from './DeepAgentsLLMProvider';
 import { CustomWebSocketSTTProvider } from './CustomSTTProvider';
 import { CustomWebSocketTTSProvider } from './CustomTTSProvider';
 
+const llm = new DeepAgentsLLMProvider({
+    wsUrl: 'ws://127.0.0.1:8080/chat'
+});
+
 const server = new LLMRTCServer({
     providers: {
-        llm: new DeepAgentsLLMProvider({
-            wsUrl: 'ws://127.0.0.1:8080/chat'
-        }),
+        llm,
         stt: new CustomWebSocketSTTProvider({
             wsUrl: 'ws://spark-4a06.tail3eb9a6.ts.net:8002/ws/asr'
         }),
@@ -34,10 +36,12 @@ server.on('listening', ({ host, port }) => {
 
 server.on('connection', ({ id }) => {
     console.log(`[server] Client connected: ${id}`);
+    llm.connectionOpened(id);
 });
 
 server.on('disconnect', ({ id }) => {
     console.log(`[server] Client disconnected: ${id}`);
+    llm.connectionClosed(id);
 });
 
 server.on('error', (err) => {
@@ -0,0 +1,88 @@
+"""Tests for the background writer that batches streamed chunks."""
+
+import asyncio
+
+import orjson
+import pytest
+
+import chunk_coalescer
+from chunk_coalescer import ChunkCoalescer
+
+
+class FakeWebSocket:
+    def __init__(self, fail: bool = False):
+        self.sent: list[dict] = []
+        self._fail = fail
+
+    async def send_bytes(self, data: bytes) -> None:
+        if self._fail:
+            raise ConnectionError("client went away")
+        self.sent.append(orjson.loads(data))
+
+
+def _sent_text(websocket: FakeWebSocket) -> str:
+    return "".join(frame["chunk"] for frame in websocket.sent)
+
+
+def test_close_flushes_queued_chunks() -> None:
+    async def run() -> FakeWebSocket:
+        websocket = FakeWebSocket()
+        coalescer = ChunkCoalescer(websocket)
+        for part in ("Hel", "lo", "!"):
+            coalescer.put(part)
+        await coalescer.close()
+        return websocket
+
+    websocket = asyncio.run(run())
+
+    assert websocket.sent == [{"chunk": "Hello!"}]
+
+
+def test_sentinel_mid_window_loses_nothing(monkeypatch: pytest.MonkeyPatch) -> None:
+    # A long window guarantees close() lands while the writer is still batching
+    monkeypatch.setattr(chunk_coalescer, "COALESCE_WINDOW_S", 10.0)
+
+    async def run() -> FakeWebSocket:
+        websocket = FakeWebSocket()
+        coalescer = ChunkCoalescer(websocket)
+        coalescer.put("first ")
+        await asyncio.sleep(0.01)
+        coalescer.put("second")
+        await asyncio.wait_for(coalescer.close(), timeout=1.0)
+        return websocket
+
+    websocket = asyncio.run(run())
+
+    assert _sent_text(websocket) == "first second"
+
+
+def test_frames_split_at_max_chars(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(chunk_coalescer, "COALESCE_MAX_CHARS", 4)
+
+    async def run() -> FakeWebSocket:
+        websocket = FakeWebSocket()
+        coalescer = ChunkCoalescer(websocket)
+        for part in ("ab", "cd", "ef"):
+            coalescer.put(part)
+        await coalescer.close()
+        return websocket
+
+    websocket = asyncio.run(run())
+
+    assert websocket.sent == [{"chunk": "abcd"}, {"chunk": "ef"}]
+
+
+def test_send_failure_sets_error_and_stops_writer() -> None:
+    async def run() -> ChunkCoalescer:
+        coalescer = ChunkCoalescer(FakeWebSocket(fail=True))
+        coalescer.put("lost")
+        await asyncio.wait_for(asyncio.shield(coalescer._task), timeout=1.0)
+        # The writer has exited, so close() must not hang on the sentinel
+        coalescer.put("ignored")
+        await asyncio.wait_for(coalescer.close(), timeout=1.0)
+        return coalescer
+
+    coalescer = asyncio.run(run())
+
+    assert isinstance(coalescer.error, ConnectionError)
+    assert coalescer._task.done()
@@ -0,0 +1,123 @@
+"""Tests for newest-upload-wins frame publishing."""
+
+import base64
+import threading
+from pathlib import Path
+
+import pytest
+
+import frames
+
+
+@pytest.fixture
+def frame_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    path = tmp_path / "latest_frame.jpg"
+    monkeypatch.setattr(frames, "FRAME_PATH", str(path))
+    monkeypatch.setattr(frames, "_latest_frame_id", 0)
+    monkeypatch.setattr(frames, "_snapshots", None)
+    return path
+
+
+def _leftover_tmp_files(frame_path: Path) -> list[Path]:
+    return list(frame_path.parent.glob("*.tmp"))
+
+
+def test_newer_frame_is_published(frame_path: Path) -> None:
+    assert frames.write_frame(b"one", 1)
+    assert frames.write_frame(b"two", 2)
+
+    assert frame_path.read_bytes() == b"two"
+    assert _leftover_tmp_files(frame_path) == []
+
+
+def test_stale_frame_before_write_is_dropped(frame_path: Path) -> None:
+    assert frames.write_frame(b"newer", 2)
+    assert not frames.write_frame(b"older", 1)
+
+    assert frame_path.read_bytes() == b"newer"
+    assert _leftover_tmp_files(frame_path) == []
+
+
+def test_frame_that_goes_stale_during_write_is_discarded(
+    frame_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    frame_path.write_bytes(b"newer")
+    real_lock = frames._frame_lock
+
+    class NewerFrameLandsLock:
+        """Publishes a newer frame id right before the stale check runs."""
+
+        def __enter__(self) -> None:
+            real_lock.acquire()
+            frames._latest_frame_id = 5
+
+        def __exit__(self, *exc: object) -> None:
+            real_lock.release()
+
+    monkeypatch.setattr(frames, "_frame_lock", NewerFrameLandsLock())
+
+    assert not frames.write_frame(b"older", 3)
+    assert frame_path.read_bytes() == b"newer"
+    assert _leftover_tmp_files(frame_path) == []
+
+
+def test_temp_file_is_unique_per_thread(
+    frame_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    opened: list[str] = []
+    real_open = frames.os.open
+
+    def recording_open(path: str, *args: object) -> int:
+        opened.append(path)
+        return real_open(path, *args)
+
+    monkeypatch.setattr(frames.os, "open", recording_open)
+
+    frames.write_frame(b"main", 1)
+    worker = threading.Thread(target=frames.write_frame, args=(b"worker", 2))
+    worker.start()
+    worker.join()
+
+    assert opened[0] == f"{frame_path}.{threading.get_ident()}.tmp"
+    assert opened[1] == f"{frame_path}.{worker.ident}.tmp"
+    assert opened[0] != opened[1]
+    assert frame_path.read_bytes() == b"worker"
+    assert _leftover_tmp_files(frame_path) == []
+
+
+def test_save_frame_decodes_base64(frame_path: Path) -> None:
+    assert frames.save_frame(base64.b64encode(b"jpeg bytes").decode(), 1)
+    assert frame_path.read_bytes() == b"jpeg bytes"
+
+
+def test_snapshot_keeps_the_frame_it_saw(frame_path: Path) -> None:
+    frames.write_frame(b"first", 1)
+    snapshot = Path(frames.snapshot_frame())
+    frames.write_frame(b"second", 2)
+
+    assert snapshot.read_bytes() == b"first"
+    assert frame_path.read_bytes() == b"second"
+    assert Path(frames.snapshot_frame()) != snapshot
+
+
+def test_snapshot_of_unchanged_frame_reuses_path(frame_path: Path) -> None:
+    frames.write_frame(b"frame", 1)
+
+    first = frames.snapshot_frame()
+    second = frames.snapshot_frame()
+
+    assert first == second
+    assert list(Path(first).parent.glob(".*.tmp")) == []
+
+
+def test_old_snapshots_are_pruned(
+    frame_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(frames, "MAX_SNAPSHOTS", 2)
+    paths = []
+    for frame_id in range(1, 4):
+        frames.write_frame(f"frame {frame_id}".encode(), frame_id)
+        paths.append(Path(frames.snapshot_frame()))
+
+    assert not paths[0].exists()
+    assert [p.read_bytes() for p in paths[1:]] == [b"frame 2", b"frame 3"]
@@ -0,0 +1,45 @@
+"""Tests for the streamed reasoning strip used by the chat bridge."""
+
+import pytest
+
+from reasoning_strip import ReasoningStripper, strip_reasoning
+
+LEAKED = "The user said hi. I should respond. Hello! How are you?"
+
+
+def _stream(chunks: list[str], *, enabled: bool = True) -> str:
+    stripper = ReasoningStripper(enabled=enabled)
+    out = [stripper.feed(chunk) for chunk in chunks]
+    out.append(stripper.flush())
+    return "".join(out)
+
+
+def test_quoted_lower_priority_greeting_does_not_end_strip() -> None:
+    """'hi' inside the preface must not win over the later 'Hello'."""
+    assert strip_reasoning(LEAKED) == "Hello! How are you?"
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, len(LEAKED)])
+def test_streamed_strip_matches_full_text_strip(size: int) -> None:
+    chunks = [LEAKED[i : i + size] for i in range(0, len(LEAKED), size)]
+    assert _stream(chunks) == "Hello! How are you?"
+
+
+def test_lower_priority_greeting_used_when_no_hello() -> None:
+    text = "This is a greeting turn. Hi there, what's up?"
+    assert _stream([text[:10], text[10:]]) == "Hi there, what's up?"
+
+
+def test_double_newline_fallback() -> None:
+    assert _stream(["The user asked a sum.\n\n", "It is 4."]) == "It is 4."
+
+
+def test_normal_response_passes_through() -> None:
+    stripper = ReasoningStripper()
+    assert stripper.feed("  Sure") == "Sure"
+    assert stripper.feed(" thing.") == " thing."
+    assert stripper.flush() == ""
+
+
+def test_disabled_stripper_forwards_preface() -> None:
+    assert _stream([LEAKED], enabled=False) == LEAKED